@@ -1,6 +1,9 @@
+from __future__ import annotations
+
+import asyncio
 import logging
 import time
-from typing import Optional
+from typing import Iterable, Optional
 
 from msmart.const import DeviceType
 from msmart.frame import Frame
@@ -57,6 +60,14 @@ class Device():
     async def refresh(self) -> None:
         raise NotImplementedError()
 
+    @classmethod
+    async def refresh_many(cls, devices: Iterable[Device]) -> list[Optional[BaseException]]:
+        """Refresh multiple devices concurrently.
+
+        Returns a list with None for each successful refresh, or the exception raised by it.
+        """
+        return await asyncio.gather(*(d.refresh() for d in devices), return_exceptions=True)
+
     async def apply(self) -> None:
         raise NotImplementedError()
 
@@ -1,6 +1,7 @@
 import argparse
 import ast
 import asyncio
+import functools
 import logging
 from typing import NoReturn
 
@@ -24,10 +25,10 @@ async def _discover(args) -> None:
     devices = []
     if args.host is None:
         _LOGGER.info("Discovering all devices on local network.")
-        devices = await Discover.discover(region=args.region, account=args.account, password=args.password, discovery_packets=args.count)
+        devices = await Discover.discover(region=args.region, account=args.account, password=args.password, cache_session=args.cache_session, discovery_packets=args.count, interval=args.interval)
     else:
         _LOGGER.info("Discovering %s on local network.", args.host)
-        dev = await Discover.discover_single(args.host, region=args.region, account=args.account, password=args.password, discovery_packets=args.count)
+        dev = await Discover.discover_single(args.host, region=args.region, account=args.account, password=args.password, cache_session=args.cache_session, discovery_packets=args.count, interval=args.interval)
         if dev:
             devices.append(dev)
 
@@ -55,7 +56,7 @@ async def _connect(args) -> AC:
     if args.auto:
         # Use discovery to automatically connect and authenticate with device
         _LOGGER.info("Discovering %s on local network.", args.host)
-        device = await Discover.discover_single(args.host, region=args.region, account=args.account, password=args.password)
+        device = await Discover.discover_single(args.host, region=args.region, account=args.account, password=args.password, cache_session=args.cache_session)
 
         if device is None:
             _LOGGER.error("Device not found.")
@@ -219,7 +220,7 @@ async def _download(args) -> None:
 
     # Use discovery to to find device information
     _LOGGER.info("Discovering %s on local network.", args.host)
-    device = await Discover.discover_single(args.host, region=args.region, account=args.account, password=args.password, auto_connect=False)
+    device = await Discover.discover_single(args.host, region=args.region, account=args.account, password=args.password, cache_session=args.cache_session, auto_connect=False)
 
     if device is None:
         _LOGGER.error("Device not found.")
@@ -235,26 +236,26 @@ async def _download(args) -> None:
         exit(1)
 
     # Get cloud connection
-    cloud = Cloud(args.region, account=args.account, password=args.password)
-    try:
-        await cloud.login()
-    except CloudError as e:
-        _LOGGER.error("Failed to establish cloud connection. Error: %s", e)
-        exit(1)
+    async with Cloud(args.region, account=args.account, password=args.password, cache_session=args.cache_session) as cloud:
+        try:
+            await cloud.login()
+        except CloudError as e:
+            _LOGGER.error("Failed to establish cloud connection. Error: %s", e)
+            exit(1)
 
-    _LOGGER.info("Downloading protocol from cloud.")
-    lua_name, lua_file = await cloud.get_protocol_lua(device.type, device.sn)
+        _LOGGER.info("Downloading protocol from cloud.")
+        lua_name, lua_file = await cloud.get_protocol_lua(device.type, device.sn)
 
-    _LOGGER.info("Writing protocol to '%s'.", lua_name)
-    with open(lua_name, "w") as f:
-        f.write(lua_file)
+        _LOGGER.info("Writing protocol to '%s'.", lua_name)
+        with open(lua_name, "w") as f:
+            f.write(lua_file)
 
-    _LOGGER.info("Downloading plugin from cloud.")
-    plugin_name, plugin_file = await cloud.get_plugin(device.type, device.sn)
+        _LOGGER.info("Downloading plugin from cloud.")
+        plugin_name, plugin_file = await cloud.get_plugin(device.type, device.sn)
 
-    _LOGGER.info("Writing plugin to '%s'.", plugin_name)
-    with open(plugin_name, "wb") as f:
-        f.write(plugin_file)
+        _LOGGER.info("Writing plugin to '%s'.", plugin_name)
+        with open(plugin_name, "wb") as f:
+            f.write(plugin_file)
 
 
 def _run(args) -> NoReturn:
@@ -286,8 +287,9 @@ def _run(args) -> NoReturn:
     exit(0)
 
 
-def main() -> NoReturn:
-    """Main entry point for msmart-ng command."""
+@functools.lru_cache(maxsize=1)
+def _build_parser() -> argparse.ArgumentParser:
+    """Build the argument parser for the msmart-ng command."""
 
     # Define the main parser to select subcommands
     parser = argparse.ArgumentParser(
@@ -315,6 +317,9 @@ def main() -> NoReturn:
     common_parser.add_argument("--china",
                                help="Use China server for discovery and authentication. Username and password must be specified.",
                                action="store_true")
+    common_parser.add_argument("--cache-session",
+                               help="Cache the cloud session on disk to skip login on later runs.",
+                               action="store_true")
 
     # Setup discover parser
     discover_parser = subparsers.add_parser("discover",
@@ -326,6 +331,9 @@ def main() -> NoReturn:
     discover_parser.add_argument("--count",
                                  help="Number of broadcast packets to send.",
                                  default=3, type=int)
+    discover_parser.add_argument("--interval",
+                                 help="Seconds to wait between broadcast packets.",
+                                 default=0.2, type=float)
     discover_parser.set_defaults(func=_discover)
 
     # Setup query parser
@@ -386,12 +394,19 @@ def main() -> NoReturn:
                           help="Hostname or IP address of device.")
     download.set_defaults(func=_download)
 
+    return parser
+
+
+def main() -> NoReturn:
+    """Main entry point for msmart-ng command."""
+
     # Run with args
-    _run(parser.parse_args())
+    _run(_build_parser().parse_args())
 
 
-def _legacy_main() -> NoReturn:
-    """Main entry point for legacy midea-discover command."""
+@functools.lru_cache(maxsize=1)
+def _build_legacy_parser() -> argparse.ArgumentParser:
+    """Build the argument parser for the legacy midea-discover command."""
 
     async def _wrap_discover(args) -> None:
         """Wrapper method to mimic legacy behavior."""
@@ -418,12 +433,20 @@ def _legacy_main() -> NoReturn:
         "-i", "--ip", help="IP address of a device. Useful if broadcasts don't work, or to query a single device.")
     parser.add_argument(
         "-c", "--count", help="Number of broadcast packets to send.", default=3, type=int)
+    parser.add_argument(
+        "--interval", help="Seconds to wait between broadcast packets.", default=0.2, type=float)
     parser.add_argument("--china", help="Use China server.",
                         action="store_true")
-    parser.set_defaults(func=_wrap_discover)
+    parser.set_defaults(func=_wrap_discover, cache_session=False)
+
+    return parser
+
+
+def _legacy_main() -> NoReturn:
+    """Main entry point for legacy midea-discover command."""
 
     # Run with args
-    _run(parser.parse_args())
+    _run(_build_legacy_parser().parse_args())
 
 
 if __name__ == "__main__":
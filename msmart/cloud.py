@@ -1,12 +1,18 @@
 """Module for minimal Midea cloud API access."""
+from __future__ import annotations
+
 import hashlib
 import hmac
+import itertools
 import json
 import logging
 import os
-from asyncio import Lock
-from datetime import datetime, timezone
+import random
+import time
+from asyncio import AbstractEventLoop, Lock, get_running_loop, sleep, to_thread
+from pathlib import Path
 from secrets import token_hex, token_urlsafe
+from types import MappingProxyType
 from typing import Any, Optional
 
 import httpx
@@ -15,8 +21,75 @@ from Crypto.Util import Padding
 
 from msmart.const import CLOUD_CREDENTIALS, DEFAULT_CLOUD_REGION, DeviceType
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# HTTP/2 support requires the optional h2 package
+try:
+    import h2  # noqa: F401 # pylint: disable=unused-import
+    _HTTP2 = True
+except ImportError:
+    _HTTP2 = False
+
 _LOGGER = logging.getLogger(__name__)
 
+# Transient network errors worth retrying
+_RECOVERABLE_ERRORS = (httpx.TimeoutException,
+                       httpx.ConnectError, httpx.RemoteProtocolError)
+
+# HTTP status codes indicating a transient server condition
+_RECOVERABLE_STATUS_CODES = (429, 500, 502, 503, 504)
+
+# API error codes indicating an invalid or expired session
+_SESSION_ERROR_CODES = (3106, 3144)
+
+
+def _json_loads(data: bytes) -> Any:
+    """Decode JSON from bytes, using orjson if available."""
+    if orjson is not None:
+        return orjson.loads(data)
+
+    return json.loads(data)
+
+
+def _json_dumps(obj: Any) -> bytes:
+    """Encode an object as compact UTF-8 JSON, using orjson if available."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("UTF-8")
+
+
+def _session_cache_path() -> Path:
+    """Return the path of the session cache file."""
+    cache_home = os.getenv("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(cache_home) / "msmart" / "session.json"
+
+
+def _read_session_cache(path: Path) -> dict[str, Any]:
+    """Read all cached sessions, returning an empty dict if unavailable."""
+    try:
+        with open(path, "rb") as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+    return cache if isinstance(cache, dict) else {}
+
+
+def _write_session_cache(path: Path, cache: dict[str, Any]) -> None:
+    """Atomically write all cached sessions, readable only by the current user."""
+    path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+
+    tmp_path = path.with_suffix(".tmp")
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "w") as f:
+        json.dump(cache, f)
+
+    os.replace(tmp_path, path)
+
 
 class CloudError(Exception):
     """Generic exception for Midea cloud errors."""
@@ -47,6 +120,16 @@ class Cloud:
     SRC = "1010"
     DEVICE_ID = token_hex(8)  # Random device ID
 
+    # Constant fields of every request body
+    _BODY_TEMPLATE = MappingProxyType({
+        "appId": APP_ID,
+        "format": FORMAT,
+        "clientType": CLIENT_TYPE,
+        "language": LANGUAGE,
+        "src": SRC,
+        "deviceId": DEVICE_ID,
+    })
+
     # Base URLs
     BASE_URL = "https://mp-prod.appsmb.com"
     BASE_URL_CHINA = "https://mp-prod.smartmidea.net"
@@ -54,12 +137,24 @@ class Cloud:
     # Default number of request retries
     RETRIES = 3
 
+    # Retry backoff parameters in seconds
+    RETRY_BASE_DELAY = 1.0
+    RETRY_MAX_DELAY = 30.0
+    RETRY_JITTER = 0.5
+
+    # Lifetime of a cached session in seconds
+    SESSION_CACHE_TTL = 24 * 60 * 60
+
+    # Maximum size of an API response in bytes
+    MAX_RESPONSE_SIZE = 1024 * 1024
+
     def __init__(self,
                  region: str = DEFAULT_CLOUD_REGION,
                  *,
                  account: Optional[str] = None,
                  password: Optional[str] = None,
-                 use_china_server: bool = False
+                 use_china_server: bool = False,
+                 cache_session: bool = False
                  ) -> None:
         # Allow override Chia server from environment
         if os.getenv("MIDEA_CHINA_SERVER", "0") == "1":
@@ -82,23 +177,103 @@ class Cloud:
         self._access_token = ""
         self._session = {}
 
-        self._api_lock = Lock()
-        self._security = _Security(use_china_server)
+        self._login_lock = Lock()
+        self._security = _get_security(use_china_server)
+
+        # Shared HTTP client, created lazily on first use
+        self._client: Optional[httpx.AsyncClient] = None
+        self._client_loop: Optional[AbstractEventLoop] = None
 
         self._base_url = Cloud.BASE_URL_CHINA if use_china_server else Cloud.BASE_URL
 
+        # Optionally persist the session to disk to skip login across restarts
+        self._cache_path = _session_cache_path() if cache_session else None
+        self._cache_key = f"{self._base_url}|{self._account}"
+        self._session_from_cache = False
+
+        # Request IDs only need to be unique, so avoid generating random IDs per request
+        self._req_id_prefix = token_hex(8)
+        self._req_id_counter = itertools.count()
+
         _LOGGER.info("Using Midea cloud server: %s (China: %s).",
                      self._base_url, use_china_server)
 
+    async def __aenter__(self) -> Cloud:
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        await self.aclose()
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """Return the shared HTTP client, creating it if necessary."""
+
+        # The client's connection pool is bound to the loop that created it
+        loop = get_running_loop()
+        if self._client is None or self._client.is_closed or self._client_loop is not loop:
+            if self._client is not None and not self._client.is_closed:
+                # A client bound to another loop can't be closed from this one, so it's
+                # dropped and its connections are released when it's garbage collected.
+                # Call aclose() before switching loops to avoid this
+                _LOGGER.warning("Event loop changed, replacing HTTP client.")
+
+            # Concurrent requests are multiplexed over a single connection with HTTP/2
+            self._client = httpx.AsyncClient(
+                http2=_HTTP2,
+                limits=httpx.Limits(max_connections=4,
+                                    max_keepalive_connections=2,
+                                    keepalive_expiry=60),
+                timeout=10.0)
+            self._client_loop = loop
+
+        return self._client
+
+    async def aclose(self) -> None:
+        """Close the shared HTTP client and any pooled connections."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+            self._client_loop = None
+
+    def _request_id(self) -> str:
+        """Generate a unique ID for a request."""
+        return f"{self._req_id_prefix}{next(self._req_id_counter):016x}"
+
     def _timestamp(self) -> str:
         """Format a timestamp for the API."""
-        return datetime.now(timezone.utc).strftime("%Y%m%d%H%M%S")
+        t = time.gmtime()
+        return "%04d%02d%02d%02d%02d%02d" % (t.tm_year, t.tm_mon, t.tm_mday,
+                                             t.tm_hour, t.tm_min, t.tm_sec)
+
+    async def _read_response(self, response: httpx.Response) -> bytes:
+        """Read a streamed response body, rejecting oversized responses."""
+
+        # Reject early if the declared length is too large
+        try:
+            length = int(response.headers["Content-Length"])
+        except (KeyError, ValueError):
+            length = 0
+
+        if length > Cloud.MAX_RESPONSE_SIZE:
+            raise CloudError(f"Response too large. Length: {length} bytes.")
 
-    def _parse_response(self, response) -> Any:
+        # Length may be missing or wrong, so also limit what is actually read
+        content = bytearray()
+        async for chunk in response.aiter_bytes():
+            content += chunk
+            if len(content) > Cloud.MAX_RESPONSE_SIZE:
+                raise CloudError("Response too large.")
+
+        return bytes(content)
+
+    def _parse_response(self, content: bytes) -> Any:
         """Parse a response from the API."""
 
-        _LOGGER.debug("API response: %s", response.text)
-        body = json.loads(response.text)
+        # Avoid decoding the response text unless it will be logged
+        if _LOGGER.isEnabledFor(logging.DEBUG):
+            _LOGGER.debug("API response: %s",
+                          content.decode("UTF-8", errors="replace"))
+
+        body = _json_loads(content)
 
         response_code = int(body["code"])
         if response_code == 0:
@@ -106,33 +281,106 @@ class Cloud:
 
         raise ApiError(body["msg"], code=response_code)
 
+    def _retry_delay(self, attempt: int, response: Optional[httpx.Response] = None) -> float:
+        """Calculate the delay before retrying a request."""
+
+        # Honor the server's requested delay if provided
+        if response is not None:
+            try:
+                delay = float(response.headers["Retry-After"])
+                return min(Cloud.RETRY_MAX_DELAY, max(0.0, delay))
+            except (KeyError, ValueError):
+                pass
+
+        # Exponential backoff with random jitter
+        delay = Cloud.RETRY_BASE_DELAY * (2 ** attempt)
+        delay *= 1 + random.random() * Cloud.RETRY_JITTER
+        return min(Cloud.RETRY_MAX_DELAY, delay)
+
     async def _post_request(self, url: str, headers: dict[str, Any],
-                            contents: str, retries: int = RETRIES) -> Optional[dict]:
+                            contents: bytes, retries: int = RETRIES) -> Optional[dict]:
         """Post a request to the API."""
 
-        async with httpx.AsyncClient() as client:
-            while retries > 0:
-                try:
-                    # Post request and handle bad status code
-                    r = await client.post(url, headers=headers, content=contents, timeout=10.0)
-                    r.raise_for_status()
-
-                    # Parse the response
-                    return self._parse_response(r)
-                except httpx.TimeoutException as e:
-                    if retries > 1:
-                        _LOGGER.warning("Request to %s timed out.", url)
-                        retries -= 1
-                    else:
+        client = self._get_client()
+        for attempt in range(retries):
+            last_attempt = attempt == retries - 1
+
+            try:
+                # Stream the response so oversized bodies can be rejected
+                async with client.stream("POST", url, headers=headers, content=contents) as r:
+                    _LOGGER.debug("Response from %s via %s.",
+                                  url, r.http_version)
+
+                    if last_attempt or r.status_code not in _RECOVERABLE_STATUS_CODES:
+                        # Handle bad status code and parse the response
+                        r.raise_for_status()
+                        return self._parse_response(await self._read_response(r))
+            except _RECOVERABLE_ERRORS as e:
+                if last_attempt:
+                    if isinstance(e, httpx.TimeoutException):
                         raise CloudError("No response from server.") from e
-                except httpx.RequestError as e:
                     raise CloudError("Request failed.") from e
 
+                _LOGGER.warning("Request to %s failed: %r", url, e)
+                delay = self._retry_delay(attempt)
+            except httpx.RequestError as e:
+                raise CloudError("Request failed.") from e
+            else:
+                _LOGGER.warning("Request to %s failed with status %d.",
+                                url, r.status_code)
+                delay = self._retry_delay(attempt, r)
+
+            _LOGGER.debug("Retrying request in %.2f seconds.", delay)
+            await sleep(delay)
+
+        return None
+
     async def _api_request(self, endpoint: str, body: dict[str, Any]) -> Optional[dict]:
         """Make a request to the Midea cloud return the results."""
 
-        # Encode body as JSON
-        contents = json.dumps(body)
+        # Save the session used for this request
+        access_token = self._access_token
+        session_from_cache = self._session_from_cache
+
+        try:
+            result = await self._signed_request(endpoint, body)
+        except (ApiError, httpx.HTTPStatusError) as e:
+            # The server may have invalidated a session restored from the cache
+            if isinstance(e, ApiError):
+                session_error = e.code in _SESSION_ERROR_CODES
+            else:
+                session_error = e.response.status_code == 401
+
+            if not session_from_cache or not session_error:
+                raise
+
+            async with self._login_lock:
+                # Another task may have already replaced the rejected session
+                if self._access_token == access_token:
+                    _LOGGER.info("Cached session rejected. Error: %s", e)
+                    await self._clear_cached_session()
+                    await self._login()
+
+            # Refresh the per-request fields so the retry isn't a replay
+            body = dict(body)
+            if "stamp" in body:
+                body["stamp"] = self._timestamp()
+            if "reqId" in body:
+                body["reqId"] = self._request_id()
+
+            return await self._signed_request(endpoint, body)
+
+        # The restored session was accepted, so later errors aren't due to the cache
+        if session_from_cache and self._access_token == access_token:
+            self._session_from_cache = False
+
+        return result
+
+    async def _signed_request(self, endpoint: str, body: dict[str, Any]) -> Optional[dict]:
+        """Sign and post a request to the Midea cloud."""
+
+        # Encode body as JSON, the same bytes are signed and sent
+        contents = _json_dumps(body)
         random = token_hex(16)
 
         # Sign the contents and add it to the header
@@ -148,30 +396,19 @@ class Cloud:
         # Build complete request URL
         url = f"{self._base_url}/mas/v5/app/proxy?alias={endpoint}"
 
-        # Lock the API and post the request
-        async with self._api_lock:
-            return await self._post_request(url, headers, contents)
+        return await self._post_request(url, headers, contents)
 
     def _build_request_body(self, data: dict[str, Any]) -> dict[str, Any]:
         """Build a request body."""
 
-        # Set up the initial body
-        body = {
-            "appId": Cloud.APP_ID,
-            "format": Cloud.FORMAT,
-            "clientType": Cloud.CLIENT_TYPE,
-            "language": Cloud.LANGUAGE,
-            "src": Cloud.SRC,
+        # Merge the constant fields, per-request fields and additional data
+        return {
+            **Cloud._BODY_TEMPLATE,
             "stamp": self._timestamp(),
-            "deviceId": Cloud.DEVICE_ID,
-            "reqId": token_hex(16),
+            "reqId": self._request_id(),
+            **data
         }
 
-        # Add additional fields to the body
-        body.update(data)
-
-        return body
-
     async def _get_login_id(self) -> str:
         """Get a login ID for the cloud account."""
 
@@ -187,12 +424,90 @@ class Cloud:
 
         return response["loginId"]
 
+    async def _load_cached_session(self) -> bool:
+        """Restore the session from the cache if a valid one exists."""
+
+        if self._cache_path is None:
+            return False
+
+        cache = await to_thread(_read_session_cache, self._cache_path)
+        entry = cache.get(self._cache_key)
+
+        try:
+            if entry["expires"] < time.time():
+                return False
+
+            login_id = entry["login_id"]
+            session = entry["session"]
+            access_token = session["mdata"]["accessToken"]
+        except (KeyError, TypeError):
+            return False
+
+        self._login_id = login_id
+        self._session = session
+        self._access_token = access_token
+        self._session_from_cache = True
+
+        _LOGGER.debug("Restored cached session from %s.", self._cache_path)
+        return True
+
+    async def _save_cached_session(self) -> None:
+        """Save the current session to the cache."""
+
+        if self._cache_path is None:
+            return
+
+        def _save(path: Path) -> None:
+            cache = _read_session_cache(path)
+            cache[self._cache_key] = {
+                "login_id": self._login_id,
+                "session": self._session,
+                "expires": time.time() + Cloud.SESSION_CACHE_TTL,
+            }
+            _write_session_cache(path, cache)
+
+        try:
+            await to_thread(_save, self._cache_path)
+        except OSError as e:
+            _LOGGER.warning("Failed to cache session. Error: %s", e)
+
+    async def _clear_cached_session(self) -> None:
+        """Remove the current session from the cache."""
+
+        self._session_from_cache = False
+
+        if self._cache_path is None:
+            return
+
+        def _clear(path: Path) -> None:
+            cache = _read_session_cache(path)
+            if cache.pop(self._cache_key, None) is not None:
+                _write_session_cache(path, cache)
+
+        try:
+            await to_thread(_clear, self._cache_path)
+        except OSError as e:
+            _LOGGER.warning("Failed to clear cached session. Error: %s", e)
+
     async def login(self, force: bool = False) -> None:
         """Login to the cloud API."""
 
-        # Don't login if session already exists
-        if self._session and not force:
-            return
+        # Serialize logins so concurrent tasks don't race to create a session
+        async with self._login_lock:
+            # Don't login if session already exists
+            if self._session and not force:
+                return
+
+            # Attempt to restore a previous session
+            if not force and await self._load_cached_session():
+                return
+
+            await self._login()
+
+    async def _login(self) -> None:
+        """Create a new session. The login lock must be held."""
+
+        self._session_from_cache = False
 
         # Get a login ID if we don't have one
         if self._login_id is None:
@@ -212,7 +527,7 @@ class Cloud:
                 "loginAccount": self._account,
                 "password": self._security.encrypt_password(self._login_id, self._password),
                 "pushToken": token_urlsafe(120),
-                "reqId": token_hex(16),
+                "reqId": self._request_id(),
                 "src": Cloud.SRC,
                 "stamp": self._timestamp(),
             },
@@ -228,6 +543,8 @@ class Cloud:
         self._access_token = response["mdata"]["accessToken"]
         _LOGGER.debug("Received accessToken: %s", self._access_token)
 
+        await self._save_cached_session()
+
     async def get_token(self, udpid: str) -> tuple[str, str]:
         """Get token and key for the provided udpid."""
 
@@ -265,13 +582,12 @@ class Cloud:
 
         file_name = response["fileName"]
         url = response["url"]
-        async with httpx.AsyncClient() as client:
-            try:
-                # Get file from server
-                r = await client.get(url, timeout=10.0)
-                r.raise_for_status()
-            except httpx.TimeoutException as e:
-                raise CloudError("No response from server.") from e
+        try:
+            # Get file from server
+            r = await self._get_client().get(url)
+            r.raise_for_status()
+        except httpx.TimeoutException as e:
+            raise CloudError("No response from server.") from e
 
         encrypted_data = bytes.fromhex(r.text)
         file_data = self._security.decrypt_aes_app_key(
@@ -332,6 +648,11 @@ class _Security:
     def __init__(self, use_china_server=False):
         self._use_china_server = use_china_server
 
+        # Derive the app key and IV once
+        app_key_hash = hashlib.sha256(self.APP_KEY.encode()).hexdigest()
+        self._app_key_and_iv = (app_key_hash[:16].encode(),
+                                app_key_hash[16:32].encode())
+
     @property
     def _iot_key(self) -> str:
         """Get the IOT key for the appropriate server."""
@@ -342,12 +663,11 @@ class _Security:
         """Get the login key for the appropriate server."""
         return _Security.LOGIN_KEY_CHINA if self._use_china_server else _Security.LOGIN_KEY
 
-    def sign(self, data: str, random: str) -> str:
+    def sign(self, data: bytes, random: str) -> str:
         """Generate a HMAC signature for the provided data and random data."""
-        msg = self._iot_key + data + random
+        msg = self._iot_key.encode("ASCII") + data + random.encode("ASCII")
 
-        sign = hmac.new(self.HMAC_KEY.encode("ASCII"),
-                        msg.encode("ASCII"), hashlib.sha256)
+        sign = hmac.new(self.HMAC_KEY.encode("ASCII"), msg, hashlib.sha256)
         return sign.hexdigest()
 
     def encrypt_password(self, login_id: str, password: str) -> str:
@@ -379,8 +699,7 @@ class _Security:
         return sha.hexdigest()
 
     def _get_app_key_and_iv(self) -> tuple[bytes, bytes]:
-        hash = hashlib.sha256(self.APP_KEY.encode()).hexdigest()
-        return (hash[:16].encode(), hash[16:32].encode())
+        return self._app_key_and_iv
 
     def encrypt_aes_app_key(self, data: bytes) -> bytes:
         key, iv = self._get_app_key_and_iv()
@@ -391,3 +710,17 @@ class _Security:
         key, iv = self._get_app_key_and_iv()
         cipher = AES.new(key, AES.MODE_CBC, iv=iv)
         return Padding.unpad(cipher.decrypt(data), 16)
+
+
+# Shared security instances keyed by server selection
+_SECURITY: dict[bool, _Security] = {}
+
+
+def _get_security(use_china_server: bool = False) -> _Security:
+    """Return a shared security instance for the selected server."""
+
+    # Instances hold no per-account state so they can be shared between clients
+    if (security := _SECURITY.get(use_china_server)) is None:
+        security = _SECURITY[use_china_server] = _Security(use_china_server)
+
+    return security
@@ -1,4 +1,4 @@
-_CRC8_854_TABLE = [
+_CRC8_854_TABLE = bytes([
     0x00, 0x5E, 0xBC, 0xE2, 0x61, 0x3F, 0xDD, 0x83,
     0xC2, 0x9C, 0x7E, 0x20, 0xA3, 0xFD, 0x1F, 0x41,
     0x9D, 0xC3, 0x21, 0x7F, 0xFC, 0xA2, 0x40, 0x1E,
@@ -31,11 +31,13 @@ _CRC8_854_TABLE = [
     0x2B, 0x75, 0x97, 0xC9, 0x4A, 0x14, 0xF6, 0xA8,
     0x74, 0x2A, 0xC8, 0x96, 0x15, 0x4B, 0xA9, 0xF7,
     0xB6, 0xE8, 0x0A, 0x54, 0xD7, 0x89, 0x6B, 0x35
-]
+])
 
 
 def calculate(data: bytes) -> int:
+    # Table and CRC are both 8 bit so the index never needs masking
+    table = _CRC8_854_TABLE
     crc_value = 0
     for m in data:
-        crc_value = _CRC8_854_TABLE[(crc_value ^ m) & 0xFF]
+        crc_value = table[crc_value ^ m]
     return crc_value
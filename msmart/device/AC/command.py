@@ -9,10 +9,13 @@ from typing import Any, Callable, Collection, Mapping, Optional, Union
 
 import msmart.crc8 as crc8
 from msmart.const import DeviceType, FrameType
-from msmart.frame import Frame
+from msmart.frame import Frame, InvalidFrameException
 
 _LOGGER = logging.getLogger(__name__)
 
+# Precompiled layout of the 16 bit little endian IDs used by capabilities and properties
+_ID_STRUCT = struct.Struct("<H")
+
 
 class InvalidResponseException(Exception):
     pass
@@ -206,35 +209,25 @@ class GetStateCommand(Command):
 class GetEnergyUsageCommand(Command):
     """Command to query energy usage from device."""
 
+    _PAYLOAD = bytes([0x41, 0x21, 0x01, 0x44]) + bytes(16)
+
     def __init__(self) -> None:
         super().__init__(frame_type=FrameType.QUERY)
 
     def tobytes(self) -> bytes:  # pyright: ignore[reportIncompatibleMethodOverride] # nopep8
-        payload = bytearray(20)
-
-        payload[0] = 0x41
-        payload[1] = 0x21
-        payload[2] = 0x01
-        payload[3] = 0x44
-
-        return super().tobytes(payload)
+        return super().tobytes(self._PAYLOAD)
 
 
 class GetHumidityCommand(Command):
     """Command to query indoor humidity from device."""
 
+    _PAYLOAD = bytes([0x41, 0x21, 0x01, 0x45]) + bytes(16)
+
     def __init__(self) -> None:
         super().__init__(frame_type=FrameType.QUERY)
 
     def tobytes(self) -> bytes:  # pyright: ignore[reportIncompatibleMethodOverride] # nopep8
-        payload = bytearray(20)
-
-        payload[0] = 0x41
-        payload[1] = 0x21
-        payload[2] = 0x01
-        payload[3] = 0x45
-
-        return super().tobytes(payload)
+        return super().tobytes(self._PAYLOAD)
 
 
 class SetStateCommand(Command):
@@ -381,7 +374,7 @@ class GetPropertiesCommand(Command):
         ])
 
         for prop in self._properties:
-            payload += struct.pack("<H", prop)
+            payload += _ID_STRUCT.pack(prop)
 
         return super().tobytes(payload)
 
@@ -401,7 +394,7 @@ class SetPropertiesCommand(Command):
         ])
 
         for prop, value in self._properties.items():
-            payload += struct.pack("<H", prop)
+            payload += _ID_STRUCT.pack(prop)
 
             # Encode property value to bytes
             value = prop.encode(value)
@@ -415,6 +408,15 @@ class SetPropertiesCommand(Command):
 class Response():
     """Base class for AC responses."""
 
+    # Responses are created for every refresh, so avoid a per-instance dict
+    __slots__ = ("_id", "_payload")
+
+    # Header, response ID, payload CRC and frame checksum
+    _MIN_FRAME_LENGTH = 13
+
+    # Group data responses have a group byte at offset 13, before the CRC
+    _MIN_GROUP_DATA_FRAME_LENGTH = 16
+
     def __init__(self, payload: memoryview) -> None:
         # Set ID and copy the payload
         self._id = payload[0]
@@ -441,7 +443,15 @@ class Response():
 
     @classmethod
     def construct(cls, frame: bytes) -> Response:
-        """Construct a response object from raw data."""
+        """Construct a response object from raw data.
+
+        Unknown response types are returned as a generic Response. Exceptions
+        are only raised for corrupt frames.
+        """
+
+        if len(frame) < Response._MIN_FRAME_LENGTH:
+            raise InvalidFrameException(
+                f"Frame '{frame.hex()}' is too short. Received: {len(frame)} bytes, Expected: >= {Response._MIN_FRAME_LENGTH}.")
 
         # Build a memoryview of the frame for zero-copy slicing
         with memoryview(frame) as frame_mv:
@@ -463,6 +473,10 @@ class Response():
                 response_class = PropertiesResponse
             elif response_id == ResponseId.GROUP_DATA:
                 # Response type depends on an additional "group" byte
+                if len(frame) < Response._MIN_GROUP_DATA_FRAME_LENGTH:
+                    raise InvalidFrameException(
+                        f"Frame '{frame.hex()}' is too short. Received: {len(frame)} bytes, Expected: >= {Response._MIN_GROUP_DATA_FRAME_LENGTH}.")
+
                 group = frame_mv[13] & 0xF
                 if group == 4:
                     response_class = EnergyUsageResponse
@@ -475,12 +489,19 @@ class Response():
                 Response.validate(frame_mv[10:-1])
 
             # Build the response
-            return response_class(frame_mv[10:-2])
+            try:
+                return response_class(frame_mv[10:-2])
+            except (IndexError, struct.error) as e:
+                # Frame passed validation but the payload is too short to parse
+                raise InvalidResponseException(
+                    f"Payload '{frame_mv[10:-2].hex()}' is too short for {response_class.__name__}.") from e
 
 
 class CapabilitiesResponse(Response):
     """Response to capabilities query."""
 
+    __slots__ = ("_capabilities", "_additional_capabilities")
+
     def __init__(self, payload: memoryview) -> None:
         super().__init__(payload)
 
@@ -583,7 +604,7 @@ class CapabilitiesResponse(Response):
                 continue
 
             # Unpack 16 bit ID
-            (raw_id, ) = struct.unpack("<H", caps[0:2])
+            (raw_id, ) = _ID_STRUCT.unpack_from(caps)
 
             # Covert ID to enumerate type
             try:
@@ -644,14 +665,14 @@ class CapabilitiesResponse(Response):
         if len(caps) > 1:
             self._additional_capabilities = bool(caps[-2])
 
-    def _get_fan_speed(self, speed) -> bool:
+    def _get_fan_speed(self, key: str) -> bool:
         # If any fan_ capability was received, check against them
         if any(k.startswith("fan_") for k in self._capabilities):
             # Assume that a fan capable of custom speeds is capable of any speed
-            return self._capabilities.get(f"fan_{speed}", False) or self._capabilities.get("fan_custom", False)
+            return self._capabilities.get(key, False) or self._capabilities.get("fan_custom", False)
 
         # Otherwise return a default set for devices that don't send the capability
-        return speed in ["low", "medium", "high", "auto"]
+        return key in ["fan_low", "fan_medium", "fan_high", "fan_auto"]
 
     def merge(self, other: CapabilitiesResponse) -> None:
         # Add other's capabilities to ours
@@ -671,23 +692,23 @@ class CapabilitiesResponse(Response):
     # Surely there's a better way than define props for each possible cap
     @property
     def fan_silent(self) -> bool:
-        return self._get_fan_speed("silent")
+        return self._get_fan_speed("fan_silent")
 
     @property
     def fan_low(self) -> bool:
-        return self._get_fan_speed("low")
+        return self._get_fan_speed("fan_low")
 
     @property
     def fan_medium(self) -> bool:
-        return self._get_fan_speed("medium")
+        return self._get_fan_speed("fan_medium")
 
     @property
     def fan_high(self) -> bool:
-        return self._get_fan_speed("high")
+        return self._get_fan_speed("fan_high")
 
     @property
     def fan_auto(self) -> bool:
-        return self._get_fan_speed("auto")
+        return self._get_fan_speed("fan_auto")
 
     @property
     def fan_custom(self) -> bool:
@@ -769,13 +790,15 @@ class CapabilitiesResponse(Response):
 
     @property
     def min_temperature(self) -> int:
-        mode = ["cool", "auto", "heat"]
-        return min([self._capabilities.get(f"{m}_min_temperature", 16) for m in mode])
+        return min(self._capabilities.get("cool_min_temperature", 16),
+                   self._capabilities.get("auto_min_temperature", 16),
+                   self._capabilities.get("heat_min_temperature", 16))
 
     @property
     def max_temperature(self) -> int:
-        mode = ["cool", "auto", "heat"]
-        return max([self._capabilities.get(f"{m}_max_temperature", 30) for m in mode])
+        return max(self._capabilities.get("cool_max_temperature", 30),
+                   self._capabilities.get("auto_max_temperature", 30),
+                   self._capabilities.get("heat_max_temperature", 30))
 
     @property
     def energy_stats(self) -> bool:
@@ -808,6 +831,12 @@ class CapabilitiesResponse(Response):
 class StateResponse(Response):
     """Response to state query."""
 
+    __slots__ = ("power_on", "target_temperature", "operational_mode",
+                 "fan_speed", "swing_mode", "turbo", "eco", "sleep",
+                 "fahrenheit", "indoor_temperature", "outdoor_temperature",
+                 "filter_alert", "display_on", "freeze_protection",
+                 "follow_me", "purifier", "target_humidity")
+
     def __init__(self, payload: memoryview) -> None:
         super().__init__(payload)
 
@@ -932,6 +961,8 @@ class StateResponse(Response):
 class PropertiesResponse(Response):
     """Response to properties query."""
 
+    __slots__ = ("_properties",)
+
     def __init__(self, payload: memoryview) -> None:
         super().__init__(payload)
 
@@ -961,7 +992,7 @@ class PropertiesResponse(Response):
                 continue
 
             # Unpack 16 bit ID
-            (raw_id, ) = struct.unpack("<H", props[0:2])
+            (raw_id, ) = _ID_STRUCT.unpack_from(props)
 
             # Covert ID to enumerate type
             try:
@@ -997,6 +1028,10 @@ class PropertiesResponse(Response):
 class EnergyUsageResponse(Response):
     """Response to a GetEnergyUsageCommand."""
 
+    __slots__ = ("total_energy", "current_energy", "real_time_power",
+                 "total_energy_binary", "current_energy_binary",
+                 "real_time_power_binary")
+
     def __init__(self, payload: memoryview) -> None:
         super().__init__(payload)
 
@@ -1073,6 +1108,8 @@ class EnergyUsageResponse(Response):
 class HumidityResponse(Response):
     """Response to a GetHumidityCommand."""
 
+    __slots__ = ("humidity",)
+
     def __init__(self, payload: memoryview) -> None:
         super().__init__(payload)
 
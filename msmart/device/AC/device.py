@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 import logging
-from typing import Any, Optional, Union, cast
+from typing import Any, Callable, Optional, Union, cast
 
 from msmart.base_device import Device
 from msmart.const import DeviceType
@@ -94,6 +94,10 @@ class AirConditioner(Device):
         PropertyId.SWING_UD_ANGLE: lambda s: s._vertical_swing_angle
     }
 
+    # Constant refresh commands are shared, message IDs are assigned when sent
+    _GET_ENERGY_USAGE_COMMAND = GetEnergyUsageCommand()
+    _GET_HUMIDITY_COMMAND = GetHumidityCommand()
+
     def __init__(self, ip: str, device_id: int,  port: int, **kwargs) -> None:
         # Remove possible duplicate device_type kwarg
         kwargs.pop("device_type", None)
@@ -163,96 +167,116 @@ class AirConditioner(Device):
 
         self._ieco = False
 
-    def _update_state(self, res: Response) -> None:
-        """Update the local state from a device state response."""
+    def _update_from_state(self, res: StateResponse) -> None:
+        """Update the local state from a state response."""
 
-        if isinstance(res, StateResponse):
-            self._power_state = res.power_on
-
-            self._target_temperature = res.target_temperature
-            self._operational_mode = cast(
-                AirConditioner.OperationalMode,
-                AirConditioner.OperationalMode.get_from_value(res.operational_mode))
-
-            if self._supports_custom_fan_speed:
-                # Attempt to fetch enum of fan speed, but fallback to raw int if custom
-                try:
-                    self._fan_speed = AirConditioner.FanSpeed(
-                        cast(int, res.fan_speed))
-                except ValueError:
-                    self._fan_speed = cast(int, res.fan_speed)
-            else:
-                self._fan_speed = AirConditioner.FanSpeed.get_from_value(
-                    res.fan_speed)
+        self._power_state = res.power_on
+
+        self._target_temperature = res.target_temperature
+        self._operational_mode = cast(
+            AirConditioner.OperationalMode,
+            AirConditioner.OperationalMode.get_from_value(res.operational_mode))
+
+        if self._supports_custom_fan_speed:
+            # Attempt to fetch enum of fan speed, but fallback to raw int if custom
+            try:
+                self._fan_speed = AirConditioner.FanSpeed(
+                    cast(int, res.fan_speed))
+            except ValueError:
+                self._fan_speed = cast(int, res.fan_speed)
+        else:
+            self._fan_speed = AirConditioner.FanSpeed.get_from_value(
+                res.fan_speed)
+
+        self._swing_mode = cast(
+            AirConditioner.SwingMode,
+            AirConditioner.SwingMode.get_from_value(res.swing_mode))
 
-            self._swing_mode = cast(
-                AirConditioner.SwingMode,
-                AirConditioner.SwingMode.get_from_value(res.swing_mode))
+        self._eco = res.eco
+        self._turbo = res.turbo
+        self._freeze_protection = res.freeze_protection
+        self._sleep = res.sleep
 
-            self._eco = res.eco
-            self._turbo = res.turbo
-            self._freeze_protection = res.freeze_protection
-            self._sleep = res.sleep
+        self._indoor_temperature = res.indoor_temperature
+        self._outdoor_temperature = res.outdoor_temperature
 
-            self._indoor_temperature = res.indoor_temperature
-            self._outdoor_temperature = res.outdoor_temperature
+        self._display_on = res.display_on
+        self._fahrenheit_unit = res.fahrenheit
 
-            self._display_on = res.display_on
-            self._fahrenheit_unit = res.fahrenheit
+        self._filter_alert = res.filter_alert
 
-            self._filter_alert = res.filter_alert
+        self._follow_me = res.follow_me
+        self._purifier = res.purifier
 
-            self._follow_me = res.follow_me
-            self._purifier = res.purifier
+        self._target_humidity = res.target_humidity
 
-            self._target_humidity = res.target_humidity
+    def _update_from_properties(self, res: PropertiesResponse) -> None:
+        """Update the local state from a properties response."""
 
-        elif isinstance(res, PropertiesResponse):
-            if (angle := res.get_property(PropertyId.SWING_LR_ANGLE)) is not None:
-                self._horizontal_swing_angle = cast(
-                    AirConditioner.SwingAngle,
-                    AirConditioner.SwingAngle.get_from_value(angle))
+        if (angle := res.get_property(PropertyId.SWING_LR_ANGLE)) is not None:
+            self._horizontal_swing_angle = cast(
+                AirConditioner.SwingAngle,
+                AirConditioner.SwingAngle.get_from_value(angle))
 
-            if (angle := res.get_property(PropertyId.SWING_UD_ANGLE)) is not None:
-                self._vertical_swing_angle = cast(
-                    AirConditioner.SwingAngle,
-                    AirConditioner.SwingAngle.get_from_value(angle))
+        if (angle := res.get_property(PropertyId.SWING_UD_ANGLE)) is not None:
+            self._vertical_swing_angle = cast(
+                AirConditioner.SwingAngle,
+                AirConditioner.SwingAngle.get_from_value(angle))
 
-            if (value := res.get_property(PropertyId.SELF_CLEAN)) is not None:
-                self._self_clean_active = value
+        if (value := res.get_property(PropertyId.SELF_CLEAN)) is not None:
+            self._self_clean_active = value
 
-            if (rate := res.get_property(PropertyId.RATE_SELECT)) is not None:
-                self._rate_select = cast(
-                    AirConditioner.RateSelect,
-                    AirConditioner.RateSelect.get_from_value(rate))
+        if (rate := res.get_property(PropertyId.RATE_SELECT)) is not None:
+            self._rate_select = cast(
+                AirConditioner.RateSelect,
+                AirConditioner.RateSelect.get_from_value(rate))
 
-            # Breeze control supersedes breeze away and breezeless
-            if (value := res.get_property(PropertyId.BREEZE_CONTROL)) is not None:
-                self._breeze_mode = (AirConditioner.BreezeMode(value) if value in AirConditioner.BreezeMode.list()
+        # Breeze control supersedes breeze away and breezeless
+        if (value := res.get_property(PropertyId.BREEZE_CONTROL)) is not None:
+            self._breeze_mode = (AirConditioner.BreezeMode(value) if value in AirConditioner.BreezeMode.list()
+                                 else AirConditioner.BreezeMode.OFF)
+        else:
+            if (value := res.get_property(PropertyId.BREEZE_AWAY)) is not None:
+                self._breeze_mode = (AirConditioner.BreezeMode.BREEZE_AWAY if value
                                      else AirConditioner.BreezeMode.OFF)
-            else:
-                if (value := res.get_property(PropertyId.BREEZE_AWAY)) is not None:
-                    self._breeze_mode = (AirConditioner.BreezeMode.BREEZE_AWAY if value
-                                         else AirConditioner.BreezeMode.OFF)
 
-                if (value := res.get_property(PropertyId.BREEZELESS)) is not None:
-                    self._breeze_mode = (AirConditioner.BreezeMode.BREEZELESS if value
-                                         else AirConditioner.BreezeMode.OFF)
+            if (value := res.get_property(PropertyId.BREEZELESS)) is not None:
+                self._breeze_mode = (AirConditioner.BreezeMode.BREEZELESS if value
+                                     else AirConditioner.BreezeMode.OFF)
 
-            if (value := res.get_property(PropertyId.IECO)) is not None:
-                self._ieco = value
+        if (value := res.get_property(PropertyId.IECO)) is not None:
+            self._ieco = value
 
-        elif isinstance(res, EnergyUsageResponse):
-            self._total_energy_usage = res.total_energy_binary if self._use_binary_energy else res.total_energy
-            self._current_energy_usage = res.current_energy_binary if self._use_binary_energy else res.current_energy
-            self._real_time_power_usage = res.real_time_power_binary if self._use_binary_energy else res.real_time_power
+    def _update_from_energy_usage(self, res: EnergyUsageResponse) -> None:
+        """Update the local state from an energy usage response."""
 
-        elif isinstance(res, HumidityResponse):
-            self._indoor_humidity = res.humidity
+        self._total_energy_usage = res.total_energy_binary if self._use_binary_energy else res.total_energy
+        self._current_energy_usage = res.current_energy_binary if self._use_binary_energy else res.current_energy
+        self._real_time_power_usage = res.real_time_power_binary if self._use_binary_energy else res.real_time_power
 
-        else:
+    def _update_from_humidity(self, res: HumidityResponse) -> None:
+        """Update the local state from a humidity response."""
+
+        self._indoor_humidity = res.humidity
+
+    # Create a dict to map response types to state update handlers
+    _RESPONSE_HANDLERS: dict[type[Response], Callable[[AirConditioner, Any], None]] = {
+        StateResponse: _update_from_state,
+        PropertiesResponse: _update_from_properties,
+        EnergyUsageResponse: _update_from_energy_usage,
+        HumidityResponse: _update_from_humidity,
+    }
+
+    def _update_state(self, res: Response) -> None:
+        """Update the local state from a device state response."""
+
+        handler = AirConditioner._RESPONSE_HANDLERS.get(type(res))
+        if handler is None:
             _LOGGER.debug("Ignored unknown response from %s:%d: %s",
                           self.ip, self.port, res.payload.hex())
+            return
+
+        handler(self, res)
 
     def _update_capabilities(self, res: CapabilitiesResponse) -> None:
         # Build list of supported operation modes
@@ -466,11 +490,11 @@ class AirConditioner(Device):
 
         # Fetch power stats if supported
         if self._request_energy_usage:
-            commands.append(GetEnergyUsageCommand())
+            commands.append(AirConditioner._GET_ENERGY_USAGE_COMMAND)
 
         # Fetch humidity if supported
         if self._supports_humidity:
-            commands.append(GetHumidityCommand())
+            commands.append(AirConditioner._GET_HUMIDITY_COMMAND)
 
         # Update supported properties
         if len(self._supported_properties):
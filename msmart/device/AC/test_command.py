@@ -790,6 +790,35 @@ class TestResponseConstruct(_TestResponseBase):
         with self.assertRaises(InvalidFrameException):
             Response.construct(TEST_RESPONSE_BAD_CHECKSUM)
 
+    def test_truncated_frame(self) -> None:
+        """Test that truncated frames with valid checksums raise exceptions."""
+        # Header and frame checksum only
+        TEST_RESPONSE_TRUNCATED = bytes.fromhex("aa0aac0000000000004a")
+
+        with self.assertRaises(InvalidFrameException):
+            Response.construct(TEST_RESPONSE_TRUNCATED)
+
+        # Group data response without a group byte
+        TEST_RESPONSE_GROUP_DATA_TRUNCATED = bytes.fromhex(
+            "aa0cac00000000000003c194f0")
+
+        with self.assertRaises(InvalidFrameException):
+            Response.construct(TEST_RESPONSE_GROUP_DATA_TRUNCATED)
+
+    def test_truncated_payload(self) -> None:
+        """Test that valid frames with truncated payloads raise exceptions."""
+        # State, energy usage and properties responses with valid checksums and CRCs
+        TEST_RESPONSES_TRUNCATED = [
+            bytes.fromhex("aa0cac00000000000003c0cabb"),
+            bytes.fromhex("aa0fac00000000000003c100004491ac"),
+            bytes.fromhex("aa0cac00000000000003b16c28"),
+        ]
+
+        for response in TEST_RESPONSES_TRUNCATED:
+            with self.subTest(response=response.hex()):
+                with self.assertRaises(InvalidResponseException):
+                    Response.construct(response)
+
     def test_properties_response_invalid_crc(self) -> None:
         """Test that PropertiesResponses with invalid CRCs are accepted."""
         # PropertiesResponse with invalid CRC
@@ -1,5 +1,7 @@
+import asyncio
 import logging
 import unittest
+import unittest.mock as mock
 
 from .command import (CapabilitiesResponse, EnergyUsageResponse,
                       HumidityResponse, PropertiesResponse, Response,
@@ -568,5 +570,47 @@ class TestSetState(unittest.TestCase):
         self.assertNotIn(PropertyId.BREEZE_CONTROL, device._updated_properties)
 
 
+class TestRefreshMany(unittest.IsolatedAsyncioTestCase):
+    # pylint: disable=protected-access
+
+    async def test_refresh_many(self) -> None:
+        """Test that multiple devices are refreshed concurrently."""
+
+        DELAY = 0.2
+
+        async def _slow_refresh() -> None:
+            await asyncio.sleep(DELAY)
+
+        devices = [AC(f"10.0.0.{i}", 0, 6444) for i in range(5)]
+        for device in devices:
+            device.refresh = mock.AsyncMock(side_effect=_slow_refresh)
+
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        results = await AC.refresh_many(devices)
+        elapsed = loop.time() - start
+
+        # Check each device was refreshed without error
+        self.assertEqual(results, [None] * len(devices))
+        for device in devices:
+            device.refresh.assert_awaited_once()
+
+        # Check refreshes overlapped rather than running serially
+        self.assertLess(elapsed, DELAY * len(devices) / 2)
+
+    async def test_refresh_many_exception(self) -> None:
+        """Test that a failing refresh doesn't prevent other refreshes."""
+
+        devices = [AC(f"10.0.0.{i}", 0, 6444) for i in range(2)]
+        devices[0].refresh = mock.AsyncMock(side_effect=TimeoutError())
+        devices[1].refresh = mock.AsyncMock(return_value=None)
+
+        results = await AC.refresh_many(devices)
+
+        self.assertIsInstance(results[0], TimeoutError)
+        self.assertIsNone(results[1])
+        devices[1].refresh.assert_awaited_once()
+
+
 if __name__ == "__main__":
     unittest.main()
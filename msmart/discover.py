@@ -55,13 +55,16 @@ class _DiscoverProtocol(asyncio.DatagramProtocol):
         *,
         target: str = _IPV4_BROADCAST,
         discovery_packets: int = 3,
+        interval: float = 0.2,
         interface: Optional[str] = None,
     ) -> None:
         self._transport = None
         self._discovery_packets = discovery_packets
+        self._interval = interval
         self._interface = interface
         self._target = target
         self._discovered_ips = set()
+        self._send_task = None
 
         self.tasks = set()
 
@@ -83,17 +86,25 @@ class _DiscoverProtocol(asyncio.DatagramProtocol):
                 socket.SOL_SOCKET, socket.SO_BINDTODEVICE, self._interface.encode()
             )
 
-        self._send_discovery()
+        self._send_task = asyncio.create_task(self._send_discovery())
 
-    def _send_discovery(self) -> None:
-        """Send discovery messages to the target."""
+    async def _send_discovery(self) -> None:
+        """Send discovery messages to the target, spaced by the interval."""
 
         # Transport should always exist
         assert self._transport is not None
 
-        for port in [6445, 20086]:
-            _LOGGER.debug("Discovery sent to %s:%d.", self._target, port)
-            for _ in range(self._discovery_packets):
+        for i in range(self._discovery_packets):
+            # Space out packets to avoid flooding the network with broadcasts
+            if i > 0:
+                await asyncio.sleep(self._interval)
+
+            # Stop if the transport was closed while waiting
+            if self._transport.is_closing():
+                return
+
+            for port in [6445, 20086]:
+                _LOGGER.debug("Discovery sent to %s:%d.", self._target, port)
                 self._transport.sendto(DISCOVERY_MSG, (self._target, port))
 
     def datagram_received(self, data, addr) -> None:
@@ -128,7 +139,9 @@ class _DiscoverProtocol(asyncio.DatagramProtocol):
         _LOGGER.error("Got error: %s", exc)
 
     def connection_lost(self, exc) -> None:
-        """NOP implementation of connection lost."""
+        """Stop sending discovery messages when the connection is lost."""
+        if self._send_task is not None:
+            self._send_task.cancel()
 
 
 class Discover:
@@ -139,6 +152,7 @@ class Discover:
     _password = None
     _lock = None
     _cloud = None
+    _cache_session = False
     _auto_connect = False
 
     @classmethod
@@ -148,13 +162,19 @@ class Discover:
         target=_IPV4_BROADCAST,
         timeout=5,
         discovery_packets: int = 3,
+        interval: float = 0.2,
         interface=None,
         region: str = DEFAULT_CLOUD_REGION,
         account: Optional[str] = None,
         password: Optional[str] = None,
+        cache_session: bool = False,
         auto_connect: bool = True
     ) -> list[Device]:
-        """Discover devices via broadcast."""
+        """Discover devices via broadcast.
+
+        If cache_session is True, the cloud session is persisted to disk
+        so later discoveries can skip logging in.
+        """
 
         # Create lock if nonexistent within the context of the current loop
         if cls._lock is None:
@@ -167,6 +187,7 @@ class Discover:
         cls._region = region
         cls._account = account
         cls._password = password
+        cls._cache_session = cache_session
 
         # Save auto connect arg
         cls._auto_connect = auto_connect
@@ -177,6 +198,7 @@ class Discover:
             lambda: _DiscoverProtocol(
                 target=target,
                 discovery_packets=discovery_packets,
+                interval=interval,
                 interface=interface,
             ),
             local_addr=("0.0.0.0", 0),
@@ -184,15 +206,20 @@ class Discover:
         protocol = cast(_DiscoverProtocol, protocol)
 
         try:
-            _LOGGER.debug("Waiting %s seconds for responses...", timeout)
-            await asyncio.sleep(timeout)
-        finally:
-            transport.close()
+            try:
+                _LOGGER.debug("Waiting %s seconds for responses...", timeout)
+                await asyncio.sleep(timeout)
+            finally:
+                transport.close()
 
-        _LOGGER.debug("Discovered %s devices.", len(protocol.tasks))
+            _LOGGER.debug("Discovered %s devices.", len(protocol.tasks))
 
-        # Wait for remaining tasks
-        devices = await asyncio.gather(*protocol.tasks)
+            # Wait for remaining tasks
+            devices = await asyncio.gather(*protocol.tasks)
+        finally:
+            # Release any pooled cloud connections. The session is preserved
+            if cls._cloud is not None:
+                await cls._cloud.aclose()
 
         # Remove any None entries
         devices = list(filter(None, devices))
@@ -226,12 +253,14 @@ class Discover:
             # Create cloud connection if nonexistent
             if cls._cloud is None:
                 cloud = Cloud(cls._region, account=cls._account,
-                              password=cls._password)
+                              password=cls._password,
+                              cache_session=cls._cache_session)
                 try:
                     await cloud.login()
                     cls._cloud = cloud
                 except CloudError as e:
                     _LOGGER.error("Failed to login to cloud. Error: %s", e)
+                    await cloud.aclose()
 
         return cls._cloud
 
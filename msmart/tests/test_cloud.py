@@ -1,5 +1,14 @@
+import asyncio
+import json
+import os
+import stat
+import tempfile
+import time
 import unittest
-from typing import Any, Optional
+import unittest.mock as mock
+from typing import Any, Callable, Optional
+
+import httpx
 
 from msmart.cloud import ApiError, Cloud, CloudError
 from msmart.const import DEFAULT_CLOUD_REGION
@@ -8,13 +17,34 @@ from msmart.const import DEFAULT_CLOUD_REGION
 class TestCloud(unittest.IsolatedAsyncioTestCase):
     # pylint: disable=protected-access
 
+    async def asyncSetUp(self) -> None:
+        self._clients: list[Cloud] = []
+
+    async def asyncTearDown(self) -> None:
+        # Close any clients created by the test
+        for client in self._clients:
+            await client.aclose()
+
+    def _create(self,
+                region: str = DEFAULT_CLOUD_REGION,
+                *,
+                account: Optional[str] = None,
+                password: Optional[str] = None,
+                cache_session: bool = False
+                ) -> Cloud:
+        client = Cloud(region, account=account, password=password,
+                       cache_session=cache_session)
+        self._clients.append(client)
+
+        return client
+
     async def _login(self,
                      region: str = DEFAULT_CLOUD_REGION,
                      *,
                      account: Optional[str] = None,
                      password: Optional[str] = None
                      ) -> Cloud:
-        client = Cloud(region, account=account, password=password)
+        client = self._create(region, account=account, password=password)
         await client.login()
 
         return client
@@ -74,14 +104,311 @@ class TestCloud(unittest.IsolatedAsyncioTestCase):
     async def test_connect_exception(self) -> None:
         """Test that an exception is thrown when the cloud connection fails."""
 
-        client = Cloud(DEFAULT_CLOUD_REGION)
+        client = self._create(DEFAULT_CLOUD_REGION)
 
         # Override URL to an invalid domain
         client._base_url = "https://fake_server.invalid."
 
+        # Skip retry backoff delays
+        with mock.patch("msmart.cloud.sleep"), self.assertRaises(CloudError):
+            await client.login()
+
+    def _mock_transport(self, client: Cloud,
+                        handler: Callable[[httpx.Request], httpx.Response]) -> None:
+        """Route the client's requests through a mock transport."""
+        client._client = httpx.AsyncClient(
+            transport=httpx.MockTransport(handler))
+        client._client_loop = asyncio.get_running_loop()
+
+    async def test_retry_backoff(self) -> None:
+        """Test that recoverable errors are retried with increasing delays."""
+
+        requests = []
+
+        def _handler(request: httpx.Request) -> httpx.Response:
+            requests.append(request)
+            raise httpx.ConnectError("Connection failed.", request=request)
+
+        client = self._create()
+        self._mock_transport(client, _handler)
+
+        with mock.patch("msmart.cloud.sleep") as mock_sleep:
+            with self.assertRaises(CloudError):
+                await client._post_request("https://fake_server.invalid", {}, b"", retries=3)
+
+        # Check all attempts were made with a delay between each
+        self.assertEqual(len(requests), 3)
+        self.assertEqual(mock_sleep.await_count, 2)
+
+        # Check delays grow and are bounded by jitter
+        first, second = (c.args[0] for c in mock_sleep.await_args_list)
+        self.assertGreaterEqual(first, Cloud.RETRY_BASE_DELAY)
+        self.assertLessEqual(first, Cloud.RETRY_BASE_DELAY *
+                             (1 + Cloud.RETRY_JITTER))
+        self.assertGreaterEqual(second, 2 * Cloud.RETRY_BASE_DELAY)
+        self.assertLessEqual(second, 2 * Cloud.RETRY_BASE_DELAY *
+                             (1 + Cloud.RETRY_JITTER))
+
+    async def test_retry_after(self) -> None:
+        """Test that transient status codes are retried honoring Retry-After."""
+
+        responses = [
+            httpx.Response(503, headers={"Retry-After": "7"}),
+            httpx.Response(200, json={"code": 0, "data": {"key": "value"}}),
+        ]
+
+        def _handler(request: httpx.Request) -> httpx.Response:
+            return responses.pop(0)
+
+        client = self._create()
+        self._mock_transport(client, _handler)
+
+        with mock.patch("msmart.cloud.sleep") as mock_sleep:
+            data = await client._post_request("https://fake_server.invalid", {}, b"")
+
+        self.assertEqual(data, {"key": "value"})
+        mock_sleep.assert_awaited_once_with(7.0)
+
+    async def test_no_retry_api_error(self) -> None:
+        """Test that API errors are not retried."""
+
+        requests = []
+
+        def _handler(request: httpx.Request) -> httpx.Response:
+            requests.append(request)
+            return httpx.Response(200, json={"code": 3101, "msg": "Bad request"})
+
+        client = self._create()
+        self._mock_transport(client, _handler)
+
+        with mock.patch("msmart.cloud.sleep") as mock_sleep:
+            with self.assertRaises(ApiError):
+                await client._post_request("https://fake_server.invalid", {}, b"")
+
+        self.assertEqual(len(requests), 1)
+        mock_sleep.assert_not_awaited()
+
+    async def test_oversized_response(self) -> None:
+        """Test that oversized responses are rejected."""
+
+        content = b" " * (Cloud.MAX_RESPONSE_SIZE + 1)
+
+        def _handler(request: httpx.Request) -> httpx.Response:
+            return httpx.Response(200, content=content)
+
+        client = self._create()
+        self._mock_transport(client, _handler)
+
         with self.assertRaises(CloudError):
+            await client._post_request("https://fake_server.invalid", {}, b"")
+
+        # Check responses without a valid length are also rejected
+        def _bad_length_handler(request: httpx.Request) -> httpx.Response:
+            return httpx.Response(200, headers={"Content-Length": "0"},
+                                  content=content)
+
+        self._mock_transport(client, _bad_length_handler)
+
+        with self.assertRaises(CloudError):
+            await client._post_request("https://fake_server.invalid", {}, b"")
+
+    def _mock_cloud_api(self, client: Cloud, requests: list[str],
+                        token: str = "ACCESS_TOKEN",
+                        rejected_tokens: tuple[str, ...] = (),
+                        rejected_code: int = 3106,
+                        rejected_status: int = 200,
+                        bodies: Optional[list[dict]] = None) -> None:
+        """Mock the login and token endpoints of the cloud API."""
+
+        def _handler(request: httpx.Request) -> httpx.Response:
+            alias = request.url.params["alias"]
+            requests.append(alias)
+
+            if bodies is not None:
+                bodies.append(json.loads(request.content))
+
+            if alias == "/v1/user/login/id/get":
+                data = {"loginId": "LOGIN_ID"}
+            elif alias == "/mj/user/login":
+                data = {"mdata": {"accessToken": token}}
+            elif request.headers["accessToken"] in rejected_tokens:
+                return httpx.Response(rejected_status, json={"code": rejected_code, "msg": "Rejected"})
+            else:
+                data = {"tokenlist": []}
+
+            return httpx.Response(200, json={"code": 0, "data": data})
+
+        self._mock_transport(client, _handler)
+
+    async def test_concurrent_login(self) -> None:
+        """Test that concurrent logins only create a single session."""
+
+        requests = []
+        client = self._create()
+        self._mock_cloud_api(client, requests)
+
+        await asyncio.gather(client.login(), client.login(), client.login())
+
+        self.assertEqual(
+            requests, ["/v1/user/login/id/get", "/mj/user/login"])
+
+    async def test_session_cache(self) -> None:
+        """Test that a cached session is saved and restored without logging in."""
+
+        with tempfile.TemporaryDirectory() as cache_dir, \
+                mock.patch.dict(os.environ, {"XDG_CACHE_HOME": cache_dir}):
+
+            # Login and check the session was cached privately
+            requests = []
+            client = self._create(cache_session=True)
+            self._mock_cloud_api(client, requests)
+            await client.login()
+
+            self.assertEqual(
+                requests, ["/v1/user/login/id/get", "/mj/user/login"])
+
+            cache_path = os.path.join(cache_dir, "msmart", "session.json")
+            self.assertEqual(stat.S_IMODE(os.stat(cache_path).st_mode), 0o600)
+
+            # Check a new client restores the session without any requests
+            requests = []
+            client = self._create(cache_session=True)
+            self._mock_cloud_api(client, requests)
+            await client.login()
+
+            self.assertEqual(requests, [])
+            self.assertEqual(client._access_token, "ACCESS_TOKEN")
+
+            # Check expired sessions are ignored
+            requests = []
+            client = self._create(cache_session=True)
+            self._mock_cloud_api(client, requests)
+            with mock.patch("msmart.cloud.time.time",
+                            return_value=time.time() + Cloud.SESSION_CACHE_TTL + 1):
+                await client.login()
+
+            self.assertIn("/mj/user/login", requests)
+
+    async def test_session_cache_disabled(self) -> None:
+        """Test that sessions are not cached unless requested."""
+
+        with tempfile.TemporaryDirectory() as cache_dir, \
+                mock.patch.dict(os.environ, {"XDG_CACHE_HOME": cache_dir}):
+            requests = []
+            client = self._create()
+            self._mock_cloud_api(client, requests)
+            await client.login()
+
+            self.assertFalse(os.path.exists(
+                os.path.join(cache_dir, "msmart", "session.json")))
+
+    async def test_session_cache_rejected(self) -> None:
+        """Test that a rejected cached session causes a single relogin."""
+
+        with tempfile.TemporaryDirectory() as cache_dir, \
+                mock.patch.dict(os.environ, {"XDG_CACHE_HOME": cache_dir}):
+            client = self._create(cache_session=True)
+            self._mock_cloud_api(client, [], token="STALE_TOKEN")
+            await client.login()
+
+            # Restore the stale session and have the server reject it
+            requests = []
+            bodies = []
+            client = self._create(cache_session=True)
+            self._mock_cloud_api(client, requests, token="NEW_TOKEN",
+                                 rejected_tokens=("STALE_TOKEN",),
+                                 bodies=bodies)
+            await client.login()
+
+            with self.assertRaises(CloudError):
+                await client.get_token("UDPID")
+
+            self.assertEqual(requests, ["/v1/iot/secure/getToken",
+                                        "/mj/user/login",
+                                        "/v1/iot/secure/getToken"])
+            self.assertEqual(client._access_token, "NEW_TOKEN")
+            self.assertFalse(client._session_from_cache)
+
+            # Check the retried request wasn't a replay of the rejected one
+            self.assertNotEqual(bodies[0]["reqId"], bodies[2]["reqId"])
+
+    async def test_session_cache_rejected_http(self) -> None:
+        """Test that a cached session rejected with HTTP 401 causes a relogin."""
+
+        with tempfile.TemporaryDirectory() as cache_dir, \
+                mock.patch.dict(os.environ, {"XDG_CACHE_HOME": cache_dir}):
+            client = self._create(cache_session=True)
+            self._mock_cloud_api(client, [], token="STALE_TOKEN")
+            await client.login()
+
+            requests = []
+            client = self._create(cache_session=True)
+            self._mock_cloud_api(client, requests, token="NEW_TOKEN",
+                                 rejected_tokens=("STALE_TOKEN",),
+                                 rejected_status=401)
+            await client.login()
+
+            with self.assertRaises(CloudError):
+                await client.get_token("UDPID")
+
+            self.assertEqual(requests, ["/v1/iot/secure/getToken",
+                                        "/mj/user/login",
+                                        "/v1/iot/secure/getToken"])
+            self.assertEqual(client._access_token, "NEW_TOKEN")
+
+    async def test_session_cache_unrelated_error(self) -> None:
+        """Test that unrelated API errors don't discard a cached session."""
+
+        with tempfile.TemporaryDirectory() as cache_dir, \
+                mock.patch.dict(os.environ, {"XDG_CACHE_HOME": cache_dir}):
+            client = self._create(cache_session=True)
+            self._mock_cloud_api(client, [])
             await client.login()
 
+            # Restore the session and fail the request for an unrelated reason
+            requests = []
+            client = self._create(cache_session=True)
+            self._mock_cloud_api(client, requests,
+                                 rejected_tokens=("ACCESS_TOKEN",),
+                                 rejected_code=1105)
+            await client.login()
+
+            with self.assertRaises(ApiError):
+                await client.get_token("UDPID")
+
+            self.assertEqual(requests, ["/v1/iot/secure/getToken"])
+            self.assertTrue(os.path.exists(
+                os.path.join(cache_dir, "msmart", "session.json")))
+
+    async def test_session_cache_accepted(self) -> None:
+        """Test that errors after a cached session is accepted don't cause a relogin."""
+
+        with tempfile.TemporaryDirectory() as cache_dir, \
+                mock.patch.dict(os.environ, {"XDG_CACHE_HOME": cache_dir}):
+            client = self._create(cache_session=True)
+            self._mock_cloud_api(client, [])
+            await client.login()
+
+            requests = []
+            client = self._create(cache_session=True)
+            self._mock_cloud_api(client, requests)
+            await client.login()
+
+            with self.assertRaises(CloudError):
+                await client.get_token("UDPID")
+
+            self.assertFalse(client._session_from_cache)
+
+            # Reject the now accepted session
+            self._mock_cloud_api(client, requests,
+                                 rejected_tokens=("ACCESS_TOKEN",))
+
+            with self.assertRaises(ApiError):
+                await client.get_token("UDPID")
+
+            self.assertEqual(requests, ["/v1/iot/secure/getToken",
+                                        "/v1/iot/secure/getToken"])
+
 
 if __name__ == "__main__":
     unittest.main()
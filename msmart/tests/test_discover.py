@@ -1,8 +1,11 @@
+import asyncio
 import unittest
+import unittest.mock as mock
 
+from msmart.cloud import CloudError
 from msmart.const import DeviceType
 from msmart.device import AirConditioner as AC
-from msmart.discover import Discover
+from msmart.discover import DISCOVERY_MSG, Discover, _DiscoverProtocol
 
 
 class TestDiscover(unittest.IsolatedAsyncioTestCase):
@@ -76,6 +79,124 @@ class TestDiscover(unittest.IsolatedAsyncioTestCase):
         device = device_class(**info)
         self.assertIsNotNone(device)
 
+    async def test_get_cloud_cache_session(self) -> None:
+        """Test that the cache session option is passed to the cloud."""
+
+        with mock.patch.multiple(Discover, _lock=asyncio.Lock(), _cloud=None,
+                                 _cache_session=True), \
+                mock.patch("msmart.discover.Cloud") as mock_cloud:
+            mock_cloud.return_value.login = mock.AsyncMock()
+
+            cloud = await Discover._get_cloud()
+
+        self.assertIs(cloud, mock_cloud.return_value)
+        self.assertTrue(mock_cloud.call_args.kwargs["cache_session"])
+
+    async def test_get_cloud_login_failure(self) -> None:
+        """Test that a cloud which fails to login is closed."""
+
+        with mock.patch.multiple(Discover, _lock=asyncio.Lock(), _cloud=None), \
+                mock.patch("msmart.discover.Cloud") as mock_cloud:
+            mock_cloud.return_value.login = mock.AsyncMock(
+                side_effect=CloudError)
+            mock_cloud.return_value.aclose = mock.AsyncMock()
+
+            cloud = await Discover._get_cloud()
+
+        self.assertIsNone(cloud)
+        mock_cloud.return_value.aclose.assert_awaited_once()
+
+    async def test_discover_cancelled(self) -> None:
+        """Test that the cloud is closed when discovery is cancelled."""
+
+        cloud = mock.AsyncMock()
+
+        async def _sleep(delay) -> None:
+            # Simulate a device requiring the cloud, then cancel discovery
+            Discover._cloud = cloud
+            raise asyncio.CancelledError
+
+        loop = asyncio.get_running_loop()
+        endpoint = mock.AsyncMock(
+            return_value=(mock.MagicMock(), mock.MagicMock()))
+
+        with mock.patch.multiple(Discover, _lock=None, _cloud=None), \
+                mock.patch.object(loop, "create_datagram_endpoint", endpoint), \
+                mock.patch("msmart.discover.asyncio.sleep", side_effect=_sleep):
+            with self.assertRaises(asyncio.CancelledError):
+                await Discover.discover()
+
+        cloud.aclose.assert_awaited_once()
+
+
+class TestDiscoverProtocol(unittest.IsolatedAsyncioTestCase):
+    # pylint: disable=protected-access
+
+    TARGET = "10.100.1.140"
+
+    def _create_transport(self) -> mock.MagicMock:
+        transport = mock.MagicMock()
+        transport.is_closing.return_value = False
+        return transport
+
+    async def test_send_discovery(self) -> None:
+        """Test that discovery packets are sent in rounds spaced by the interval."""
+
+        transport = self._create_transport()
+        protocol = _DiscoverProtocol(target=self.TARGET,
+                                     discovery_packets=3, interval=0.5)
+
+        with mock.patch("msmart.discover.asyncio.sleep") as mock_sleep:
+            # Record sends and sleeps in a single timeline
+            timeline = mock.Mock()
+            timeline.attach_mock(transport.sendto, "sendto")
+            timeline.attach_mock(mock_sleep, "sleep")
+
+            protocol.connection_made(transport)
+            await protocol._send_task
+
+        # Check each round is sent to both ports, with no wait before the first
+        packets = [mock.call.sendto(DISCOVERY_MSG, (self.TARGET, 6445)),
+                   mock.call.sendto(DISCOVERY_MSG, (self.TARGET, 20086))]
+        self.assertEqual(timeline.mock_calls,
+                         packets + [mock.call.sleep(0.5)] +
+                         packets + [mock.call.sleep(0.5)] +
+                         packets)
+
+    async def test_send_discovery_closed(self) -> None:
+        """Test that discovery packets stop once the transport is closing."""
+
+        transport = self._create_transport()
+        transport.is_closing.side_effect = [False, True]
+        protocol = _DiscoverProtocol(target=self.TARGET,
+                                     discovery_packets=3, interval=0.5)
+
+        with mock.patch("msmart.discover.asyncio.sleep") as mock_sleep:
+            protocol.connection_made(transport)
+            await protocol._send_task
+
+        # Check only the first round was sent
+        self.assertEqual(transport.sendto.call_count, 2)
+        mock_sleep.assert_awaited_once_with(0.5)
+
+    async def test_connection_lost(self) -> None:
+        """Test that losing the connection cancels pending discovery packets."""
+
+        transport = self._create_transport()
+        protocol = _DiscoverProtocol(target=self.TARGET,
+                                     discovery_packets=3, interval=60)
+
+        protocol.connection_made(transport)
+
+        # Let the first round send, then wait for the interval
+        await asyncio.sleep(0)
+        protocol.connection_lost(None)
+
+        with self.assertRaises(asyncio.CancelledError):
+            await protocol._send_task
+
+        self.assertEqual(transport.sendto.call_count, 2)
+
 
 if __name__ == "__main__":
     unittest.main()